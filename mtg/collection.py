@@ -1,6 +1,10 @@
 import os
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+from pandas.api.types import union_categoricals
 from typing import Any, Sequence, Tuple, Union, Optional, List
 
 # The Key to the Get Access to the DataFrame, i.e. string | Series
@@ -54,6 +58,43 @@ class Collection:
         "PurchaseDate",
     ]
 
+    # Conditional: Ordinal Type
+    # Poor < Played < LightPlayed < Good, < Excellent < Near Mint < Mint Mint
+    CONDITIONS = [
+        "Poor",
+        "Played",
+        "LightPlayed",
+        "Good",
+        "Excellent",
+        "NearMint",
+        "Mint",
+    ]
+
+    # Old-format Condition codes (i.e. NearMint, Excellent, Good, Played, Poor)
+    # mapped to their position in CONDITIONS
+    OLDFORMAT_CONDITION_CODES = np.array([5, 4, 3, 1, 0], dtype=np.int8)
+
+    # Old-format Language labels, indexed by their codes
+    OLDFORMAT_LANGUAGES = [
+        "English",
+        "German",
+        "Portuguese",
+        "French",
+        "Italian",
+        "Spanish",
+        "Japanese",
+        "Simplified Chinese",
+        "Russian",
+        "Traditional Chinese",
+        "Korean",
+    ]
+
+    # Version of the normalised data format in the Feather cache files:
+    # to be increased whenever the normalisation in _read_mtg_data changes
+    CACHE_FORMAT_VERSION = 3
+    # Feather cache metadata key, holding the fingerprint of the cached CSV file
+    CACHE_SOURCE_KEY = b"source"
+
     def __init__(
         self, filepath: Union[Path, str], label: str = None, source: str = None
     ):
@@ -75,40 +116,55 @@ class Collection:
     def _read_mtg_data(self) -> pd.DataFrame:
         """Function to read data from CSV files into Pandas DataFrame.
         The function will include several operation to 'normalise' the
-        dataframe format between the old and the new data."""
+        dataframe format between the old and the new data.
+        Normalised data are cached (if possible) in a Feather file next to the CSV
+        file, which is used instead of the CSV, as long as this is left unchanged."""
+        cache_filepath = self._cache_filepath(self.filepath)
+        if cache_filepath.exists():
+            try:
+                cache = feather.read_table(cache_filepath)
+            except (OSError, ValueError):
+                cache = None  # unreadable cache: fall back to the CSV file
+            if cache is not None and (cache.schema.metadata or {}).get(
+                self.CACHE_SOURCE_KEY
+            ) == self._source_fingerprint(self.filepath):
+                return cache.to_pandas()
+
+        # first-off check whether data is still in old_format
+        # This is to be verified before any remapping to columns
+        header = pd.read_csv(self.filepath, nrows=0, quotechar='"').columns
+        is_old_format = "Code" in header
+        # Explicit dtypes spare the parser the (costly) type inference.
+        # Integer columns use nullable dtypes, so that blank cells are read as
+        # missing values (as inferred) rather than raising a parsing error.
+        dtypes = {"Quantity": "Int32", "Name": str}
+        if is_old_format:  # OLD MTGManager format: Condition and Language as codes
+            # codes are validated in _fix_oldformat
+            dtypes.update({"Code": str, "Condition": "Int64", "Language": "Int64"})
+        else:
+            # Conditional: Ordinal Type; Language: Nominal Type
+            dtypes.update(
+                {
+                    "Condition": pd.CategoricalDtype(self.CONDITIONS, ordered=True),
+                    "Language": "category",
+                }
+            )
         df = pd.read_csv(
             self.filepath,
             header=0,
+            dtype=dtypes,
             parse_dates=[
                 "PurchaseDate",
             ],
+            cache_dates=True,
+            low_memory=False,
             quotechar='"',
         )
-        # first-off check whether data is still in old_format
-        # This is to be verified before any remapping to columns
-        is_old_format = "Code" in df.columns
-        if is_old_format:  # OLD MTGManager format
+        if is_old_format:
             self._fix_oldformat(df)
 
         # Map Foil as Boolean
-        df["Foil"] = df.Foil.map(bool)
-        # Conditional: Ordinal Type
-        # Poor < Played < LightPlayed < Good, < Excellent < Near Mint < Mint Mint
-        df["Condition"] = pd.Categorical(
-            df.Condition.values,
-            ordered=True,
-            categories=[
-                "Poor",
-                "Played",
-                "LightPlayed",
-                "Good",
-                "Excellent",
-                "NearMint",
-                "Mint",
-            ],
-        )
-        # Language: Nominal Type
-        df["Language"] = pd.Categorical(df.Language.values)
+        df["Foil"] = df.Foil.astype(bool)
         # re-map columns
         if len(df.columns) == 8:  # No ExpansionName or "Expansion Name" in cols
             cols_layout = self.EIGHT_COLS_LAYOUT
@@ -116,33 +172,67 @@ class Collection:
             cols_layout = self.NINE_COLS_LAYOUT
         df.columns = cols_layout
 
+        self._write_cache(df, self.filepath)
         return df
 
+    @classmethod
+    def _cache_filepath(cls, filepath: Path) -> Path:
+        """Feather cache file of the input CSV file, for the current cache format"""
+        return filepath.with_suffix(f".v{cls.CACHE_FORMAT_VERSION}.feather")
+
+    @staticmethod
+    def _source_fingerprint(filepath: Path) -> bytes:
+        """Fingerprint (size and modification time) of the input CSV file"""
+        stat = filepath.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+
+    @classmethod
+    def _write_cache(cls, df: pd.DataFrame, filepath: Path) -> None:
+        """Write (normalised) data in the Feather cache file of the input CSV file,
+        along with the fingerprint of the latter, if possible:
+        the cache is just an optimisation, so any failure is ignored."""
+        try:
+            cache = pa.Table.from_pandas(df, preserve_index=False)
+            cache = cache.replace_schema_metadata(
+                {
+                    **cache.schema.metadata,
+                    cls.CACHE_SOURCE_KEY: cls._source_fingerprint(filepath),
+                }
+            )
+            feather.write_feather(cache, cls._cache_filepath(filepath))
+        except (OSError, ValueError, TypeError):
+            pass
+
     def _fix_oldformat(self, df: pd.DataFrame):
         """Quick fix to Old-format data"""
 
         # 1. transform all expansion code in lower-case
-        df["Code"] = df.Code.apply(lambda c: c.lower())
-        # 2. Re-map Condition to the new categorical scale
-        df["Condition"] = df.Condition.map(
-            {0: "NearMint", 1: "Excellent", 2: "Good", 3: "Played", 4: "Poor"}
+        df["Code"] = df.Code.str.lower()
+        # 2. Re-map Condition codes to the new categorical scale
+        df["Condition"] = pd.Categorical.from_codes(
+            self._remap_codes(df.Condition, self.OLDFORMAT_CONDITION_CODES),
+            categories=self.CONDITIONS,
+            ordered=True,
         )
-        # 3. remap languages to match the new labels
-        df["Language"] = df.Language.map(
-            {
-                0: "English",
-                1: "German",
-                2: "Portuguese",
-                3: "French",
-                4: "Italian",
-                5: "Spanish",
-                6: "Japanese",
-                7: "Simplified Chinese",
-                8: "Russian",
-                9: "Traditional Chinese",
-                10: "Korean",
-            }
+        # 3. remap languages to match the new labels,
+        # with (sorted) categories as inferred for the new format
+        languages = sorted(self.OLDFORMAT_LANGUAGES)
+        languages_codes = np.array(
+            [languages.index(l) for l in self.OLDFORMAT_LANGUAGES], dtype=np.int8
         )
+        df["Language"] = pd.Categorical.from_codes(
+            self._remap_codes(df.Language, languages_codes), categories=languages
+        ).remove_unused_categories()
+
+    @staticmethod
+    def _remap_codes(codes: pd.Series, mapping: np.ndarray) -> np.ndarray:
+        """Remap (old-format) integer codes to categorical codes via mapping.
+        Missing, non-integer, or out of range codes are mapped to -1 (i.e. NaN)."""
+        codes = codes.to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = (codes >= 0) & (codes < len(mapping)) & (codes == np.floor(codes))
+        remapped = np.full(len(codes), -1, dtype=np.int8)
+        remapped[valid] = mapping[codes[valid].astype(np.int64)]
+        return remapped
 
     @property
     def data(self) -> pd.DataFrame:
@@ -181,7 +271,7 @@ class Collection:
             self.data.loc[key] = value
 
     def __len__(self) -> int:
-        return self.data.Quantity.values.sum()
+        return int(self.data["Quantity"].sum())
 
     def diff(self, collection: "Collection") -> pd.DataFrame:
 
@@ -194,19 +284,33 @@ class Collection:
         if set(self.data.columns) != set(collection.data.columns):
             raise ValueError("The compared collection has different columns!")
 
-        left, right = self.data.copy(), collection.data.copy()
         # Exclude PurchaseDate from final cols layout
         if len(self.data.columns) == 8:
             cols_layout = self.EIGHT_COLS_LAYOUT[:-1]
         else:
             cols_layout = self.NINE_COLS_LAYOUT[:-1]
         # get rid of Purchase Date due to BUG in date parsing from old to new app
-        left, right = left[cols_layout], right[cols_layout]
-
-        # lowercase all card names
-        left["Name"] = left.Name.apply(lambda n: n.lower())
-        right["Name"] = right.Name.apply(lambda n: n.lower())
-        return left[~left.apply(tuple, 1).isin(right.apply(tuple, 1))]
+        # and lowercase all card names
+        left = self.data[cols_layout].assign(Name=lambda df: df.Name.str.lower())
+        right = collection.data[cols_layout].assign(Name=lambda df: df.Name.str.lower())
+        # String keys as categoricals sharing the same categories on both sides,
+        # so that the join compares integer codes rather than strings
+        left_keys, right_keys = left, right
+        for col in ("Name", "ExpansionCode", "ExpansionName", "Language"):
+            if col not in cols_layout:
+                continue
+            categories = union_categoricals(
+                [left[col].astype("category"), right[col].astype("category")],
+                ignore_order=True,
+            ).categories
+            dtype = pd.CategoricalDtype(categories)
+            left_keys = left_keys.assign(**{col: left[col].astype(dtype)})
+            right_keys = right_keys.assign(**{col: right[col].astype(dtype)})
+        # hashed (left) join: unique right rows keep the left rows in place, 1-to-1
+        merged = left_keys.merge(
+            right_keys.drop_duplicates(), on=cols_layout, how="left", indicator=True
+        )
+        return left[(merged["_merge"] == "left_only").values]
 
     def __sub__(self, collection: "Collection") -> pd.DataFrame:
         return self.diff(collection)
@@ -241,6 +345,8 @@ class Collection:
             os.makedirs(target_folder, exist_ok=True)
             filepath = Path(target_folder) / self.filepath.name
         self.data.to_csv(filepath, index=False, quotechar='"')
+        # (re-)write the cache, after the CSV file so that it is not stale
+        self._write_cache(self.data, filepath)
         if verbose:
             fp = filepath.relative_to(relative) if relative else self.name
             print(f"{self.name} saved in {fp}")
@@ -1,95 +1,338 @@
-import json
+import numpy as np
+import orjson
+import os
+import pickle
+import pyarrow as pa
 import requests
+import shutil
 import sys
-from typing import Tuple, Iterable, Sequence, Dict, Optional
-from functools import reduce, partial
-from operator import and_, is_
-from collections import defaultdict, namedtuple
+from typing import Tuple, Iterable, Sequence, Dict, Optional, Callable, List
+from bisect import bisect_left
+from functools import lru_cache
+from operator import is_
+from collections import OrderedDict, defaultdict, namedtuple
 from . import DATA_FOLDER
+from pyarrow import feather
 from tqdm import tqdm
 
 SCRYFALL_DEFAULT_CARDS_URL = "https://c2.scryfall.com/file/scryfall-bulk/default-cards/default-cards-20210508090304.json"
 SCRYFALL_DATA_FOLDER = DATA_FOLDER / "scryfall"
 SCRYFALL_DB = SCRYFALL_DATA_FOLDER / "default_cards.json"
+LOOKUP_CACHE_SIZE = 4096
+# Schema metadata key of the projected cards, holding the fingerprint of the JSON DB
+SOURCE_METADATA_KEY = b"source"
 
 
 def download_and_save(dbfile=SCRYFALL_DB):
     print("Downloading DB file (Default Cards) from Scryfall")
-    # Streaming, so we can iterate over the response.
-    response = requests.get(SCRYFALL_DEFAULT_CARDS_URL, stream=True)
-    total_size_in_bytes = int(response.headers.get("content-length", 0))
-    block_size = 4096  # 4 Kibibyte
-    progress_bar = tqdm(
-        total=total_size_in_bytes, unit="iB", unit_scale=True, file=sys.stdout
-    )
-    with open(dbfile, "wb") as scryfall_db:
-        for data in response.iter_content(block_size):
-            progress_bar.update(len(data))
-            scryfall_db.write(data)
-    progress_bar.close()
+    # Streaming, so we can copy the raw response in (large) blocks.
+    with requests.Session() as session:
+        response = session.get(SCRYFALL_DEFAULT_CARDS_URL, stream=True)
+        response.raw.decode_content = True
+        total_size_in_bytes = int(response.headers.get("content-length", 0))
+        block_size = 1024 * 1024  # 1 Mebibyte
+        with tqdm.wrapattr(
+            response.raw,
+            "read",
+            total=total_size_in_bytes,
+            unit="iB",
+            unit_scale=True,
+            file=sys.stdout,
+        ) as raw_response, open(dbfile, "wb") as scryfall_db:
+            shutil.copyfileobj(raw_response, scryfall_db, length=block_size)
     print(f"DB file saved in {dbfile}!")
 
 
-def load_scryfall_dbjson(dbfile=SCRYFALL_DB):
-    def json_hook(obj, pbar):
-        pbar.update(1)
-        return obj
+Card = namedtuple("Card", ["name", "lang", "set_code", "set_name", "set_type"])
+# Columnar (projected) cards: one string column per Card field
+CARDS_SCHEMA = pa.schema([(field, pa.string()) for field in Card._fields])
+
+
+@lru_cache(maxsize=1 << 16)
+def make_dbentry(name: str) -> str:
+    return name.casefold().replace(" ", "-")
+
+
+def project_cards(scryfall_db: Iterable[Dict]) -> pa.Table:
+    """Project (raw) Scryfall DB entries into a columnar table holding only
+    Card fields for English, non online-only, cards."""
+    columns = {field: [] for field in Card._fields}
+    # Bind column appends once, positionally in Card fields order
+    add_name, add_lang, add_set_code, add_set_name, add_set_type = (
+        columns[field].append for field in Card._fields
+    )
+    for entry in scryfall_db:
+        if entry["lang"] != "en":
+            continue
+        games = entry["games"]
+        if games and len(games) == 1 and games[0] == "mtgo":
+            continue  # skip Online-only Expansion Promo Sets
+        add_name(entry["name"])
+        add_lang(entry["lang"])
+        add_set_code(entry["set"])
+        add_set_name(entry["set_name"])
+        add_set_type(entry["set_type"])
+    return pa.table(columns, schema=CARDS_SCHEMA)
+
+
+def source_fingerprint(dbfile) -> str:
+    """Fingerprint (size and modification time) of the JSON DB file"""
+    stat = dbfile.stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_scryfall_dbjson(dbfile=SCRYFALL_DB) -> pa.Table:
+    # Projected cards are cached in a Feather file next to the JSON DB,
+    # so that the (BIG) JSON file is parsed only when the cache is stale.
+    cache_file = dbfile.with_suffix(".feather")
+    if cache_file.exists() and (
+        not dbfile.exists() or cache_file.stat().st_mtime >= dbfile.stat().st_mtime
+    ):
+        print("Loading Cards from cache file")
+        try:
+            return feather.read_table(cache_file, memory_map=True)
+        except (OSError, pa.ArrowInvalid):
+            print("Cache file is not readable!")  # fall back to the JSON DB
 
     if not dbfile.exists():
         print("DB file does not exist!")
         download_and_save(dbfile=dbfile)
     # For Performance Issues, load (BIG ~= 1.20GB) JSON DB from Scryfall just once
-    with open(dbfile) as scryfalldb_file:
-        print("Loading Full Database file")
-        pbar = tqdm(ascii=True, desc="Cards", unit="", file=sys.stdout)
-        hook = partial(json_hook, pbar=pbar)
-        scryfall_db = json.load(scryfalldb_file, object_hook=hook)
-        pbar.close()
-    return scryfall_db
-
-
-Card = namedtuple("Card", ["name", "lang", "set_code", "set_name", "set_type"])
+    # orjson parses the whole document in a single C-level pass (no per-object callback)
+    # Progress is tracked on the file position, while reading into a single buffer
+    print("Loading Full Database file")
+    db_content = bytearray(dbfile.stat().st_size)
+    block_size = 16 * 1024 * 1024  # 16 Mebibyte
+    with open(dbfile, "rb") as scryfalldb_file, tqdm(
+        total=len(db_content), unit="iB", unit_scale=True, file=sys.stdout
+    ) as progress_bar:
+        buffer = memoryview(db_content)
+        position = 0
+        while position < len(db_content):
+            read = scryfalldb_file.readinto(buffer[position : position + block_size])
+            if not read:
+                break
+            position += read
+            progress_bar.update(read)
+    scryfall_db = orjson.loads(db_content)
+    cards_table = project_cards(scryfall_db)
+    # Projected cards (and their cache) keep track of the JSON DB they come from
+    cards_table = cards_table.replace_schema_metadata(
+        {SOURCE_METADATA_KEY: source_fingerprint(dbfile)}
+    )
+    # Uncompressed, so that the cache can be memory-mapped with zero copies.
+    # Written to a temporary file first, so that an interrupted write never
+    # leaves a truncated cache file behind.
+    tmp_cache_file = cache_file.with_suffix(".feather.tmp")
+    try:
+        feather.write_feather(cards_table, tmp_cache_file, compression="uncompressed")
+        os.replace(tmp_cache_file, cache_file)
+    except OSError:
+        # e.g. read-only DB folder: the JSON DB is parsed again next time
+        tmp_cache_file.unlink(missing_ok=True)
+    return cards_table
 
 
 class ScryfallDB:
     """Cards ScryfallDB"""
 
+    # Attributes holding the card name indices (persisted in the index file)
+    NAME_INDICES = (
+        "_word_index",
+        "_prefix_index",
+        "_suffix_index",
+        "_doubles",
+        "_cards_map",
+    )
+    # to be increased whenever the name indices (or NAME_INDICES) change
+    INDEX_FORMAT_VERSION = 2
+
     def __init__(self, dbfile=SCRYFALL_DB, db_preloaded=None):
         if not db_preloaded:
             self._db_file = dbfile
             self._db = load_scryfall_dbjson(dbfile=dbfile)
         else:
             self._db_file = None
+            if not isinstance(db_preloaded, pa.Table):
+                db_preloaded = project_cards(db_preloaded)
             self._db = db_preloaded
 
-        self._cards_map = defaultdict(list)
         print("\nLoading Cards from Database into Oracle")
         self._load_cards_from_db()
-        self._expansion_codename_map = self._load_codename_map()
+        # Lookup results, memoised in LRU order
+        self._lookup_cache = OrderedDict()
 
     def _load_cards_from_db(self):
-        for entry in self._db:
-            if entry["lang"] != "en":
-                continue
-            if (
-                entry["games"]
-                and len(entry["games"]) == 1
-                and entry["games"][0] == "mtgo"
-            ):
-                continue  # skip Online-only Expansion Promo Sets
-            c = Card(
-                name=entry["name"],
-                lang=entry["lang"],
-                set_code=entry["set"],
-                set_name=entry["set_name"],
-                set_type=entry["set_type"],
-            )
-            dbentry = self.make_dbentry(c.name)
-            self._cards_map[dbentry].append(c)
+        """Load cards as a columnar (struct-of-arrays) table, with set and language
+        columns dictionary-encoded, and index each name entry to its row positions.
+        Card instances are only materialised for the rows actually retrieved."""
+        db = self._db.select(Card._fields).cast(CARDS_SCHEMA)
+        # Each column is made of exactly one chunk (even if the table is empty)
+        columns = {field: db.column(field).combine_chunks() for field in Card._fields}
+        self._cards = pa.table(
+            {
+                field: pa.chunked_array(
+                    [column if field == "name" else column.dictionary_encode()]
+                )
+                for field, column in columns.items()
+            }
+        )
+        # Values of the dictionary-encoded columns, converted to Python strings once
+        self._dictionaries = {
+            field: column.chunk(0).dictionary.to_pylist()
+            for field, column in zip(self._cards.column_names, self._cards.columns)
+            if pa.types.is_dictionary(column.type)
+        }
+        self._name_ids = (
+            columns["name"].dictionary_encode().indices.to_numpy(zero_copy_only=False)
+        )
+        self._load_name_indices()
+        # set code / set type -> rows, for lookups with no card name
+        self._set_codes_index = self._rows_index("set_code")
+        self._set_types_index = self._rows_index("set_type")
+        self._sorted_set_codes = sorted(self._set_codes_index)
+        self._expansion_codename_map = self._load_codename_map()
+
+    def _load_name_indices(self) -> None:
+        """Load the card name indices from the index file saved next to the DB
+        (if built from the very same cards, in the same format), or build them
+        (and save them, if possible) otherwise."""
+        index_file = None
+        if self._db_file is not None:
+            index_file = self._db_file.with_suffix(".index.pkl")
+            # Indices hold row positions: only valid for the cards they were built on
+            metadata = self._db.schema.metadata or {}
+            fingerprint = (metadata.get(SOURCE_METADATA_KEY), self._cards.num_rows)
+            if fingerprint[0] is None:
+                index_file = None  # unknown source: indices could not be validated
+            elif index_file.exists():
+                try:
+                    with open(index_file, "rb") as indices_file:
+                        version, index_fingerprint, indices = pickle.load(indices_file)
+                except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+                    version = None  # unreadable index file: rebuild indices
+                if (
+                    version == self.INDEX_FORMAT_VERSION
+                    and index_fingerprint == fingerprint
+                ):
+                    print("Loading Cards indices from file")
+                    for attr, index in zip(self.NAME_INDICES, indices):
+                        setattr(self, attr, index)
+                    return
+
+        self._build_name_indices()
+        if index_file is not None:
+            indices = tuple(getattr(self, attr) for attr in self.NAME_INDICES)
+            try:
+                with open(index_file, "wb") as indices_file:
+                    pickle.dump(
+                        (self.INDEX_FORMAT_VERSION, fingerprint, indices),
+                        indices_file,
+                        protocol=5,
+                    )
+            except OSError:
+                pass  # e.g. read-only DB folder: indices are rebuilt next time
+
+    def _build_name_indices(self) -> None:
+        """Build indices on (case-folded) names:
+        word -> rows (WHOLE-WORD), and sorted (reversed) names (PREFIX/SUFFIX)
+        for expanded searches, and name entry -> rows for exact lookups."""
+        names = self._cards.column("name").to_pylist()
+        names_folded = [name.casefold() for name in names]
+        self._word_index = defaultdict(set)
+        for row, name in enumerate(names_folded):
+            for word in name.split():
+                self._word_index[word].add(row)
+        self._prefix_index = self._sorted_index(names_folded)
+        self._suffix_index = self._sorted_index([name[::-1] for name in names_folded])
+        self._doubles = np.fromiter(
+            ("//" in name for name in names_folded), dtype=bool, count=len(names_folded)
+        )
+        cards_rows = defaultdict(list)
+        # Bypass the lookup cache: DB names would only evict the queried ones
+        for row, name in enumerate(names):
+            cards_rows[make_dbentry.__wrapped__(name)].append(row)
+        self._cards_map = {
+            dbentry: np.asarray(rows, dtype=np.int64)
+            for dbentry, rows in cards_rows.items()
+        }
+
+    def _rows_index(self, field: str) -> Dict[str, np.ndarray]:
+        """Map each value of a dictionary-encoded field to its (sorted) row positions"""
+        column = self._cards.column(field).chunk(0)
+        codes = column.indices.to_numpy(zero_copy_only=False)
+        rows = np.argsort(codes, kind="stable")
+        bounds = np.cumsum(np.bincount(codes, minlength=len(column.dictionary)))
+        return dict(zip(column.dictionary.to_pylist(), np.split(rows, bounds[:-1])))
+
+    def _set_code_rows(self, set_code: str, exact: bool) -> np.ndarray:
+        """Rows of cards in the set with input code (or prefix, if not exact)"""
+        if exact:
+            return self._set_codes_index.get(set_code, np.empty(0, dtype=np.int64))
+        # codes starting with the prefix are a contiguous range of the sorted codes
+        start = bisect_left(self._sorted_set_codes, set_code)
+        stop = bisect_left(
+            self._sorted_set_codes, set_code + chr(sys.maxunicode), lo=start
+        )
+        matching = [
+            self._set_codes_index[code] for code in self._sorted_set_codes[start:stop]
+        ]
+        if not matching:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(matching))
+
+    @staticmethod
+    def _sorted_index(keys: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+        """Sort input keys, along with their corresponding row positions"""
+        rows = sorted(range(len(keys)), key=keys.__getitem__)
+        return [keys[r] for r in rows], np.asarray(rows, dtype=np.int64)
 
     @staticmethod
-    def make_dbentry(name: str) -> str:
-        return name.lower().replace(" ", "-")
+    def _startswith_rows(
+        sorted_index: Tuple[List[str], np.ndarray], prefix: str
+    ) -> np.ndarray:
+        """Binary search of the rows whose (sorted) key starts with input prefix"""
+        keys, rows = sorted_index
+        start = bisect_left(keys, prefix)
+        stop = bisect_left(keys, prefix + chr(sys.maxunicode), lo=start)
+        return rows[start:stop]
+
+    def _take(self, rows: np.ndarray) -> Tuple[Card]:
+        """Materialise the Card instances corresponding to input table rows"""
+        return tuple(self._iter_cards(self._cards.take(rows)))
+
+    def _iter_cards(self, cards: pa.Table) -> Iterable[Card]:
+        """Generate Card instances from the rows of the input table.
+        Values of dictionary-encoded columns are shared among cards
+        (see _dictionaries), rather than allocating a new string per card."""
+        for batch in cards.to_batches():
+            columns = list()
+            for field in Card._fields:
+                column = batch.column(field)
+                if field in self._dictionaries:
+                    values = self._dictionaries[field]
+                    columns.append([values[i] for i in column.indices.to_pylist()])
+                else:
+                    columns.append(column.to_pylist())
+            for values in zip(*columns):
+                yield Card._make(values)
+
+    def _filter_rows(
+        self, rows: np.ndarray, criteria: Sequence[Tuple[str, Callable[[str], bool]]]
+    ) -> np.ndarray:
+        """Filter table rows on (field, predicate) criteria over dictionary-encoded
+        fields, in a single pass: predicates are only evaluated on the (few)
+        dictionary values, and rows are matched on their codes."""
+        mask = np.ones(len(rows), dtype=bool)
+        for field, predicate in criteria:
+            column = self._cards.column(field).chunk(0)
+            values = self._dictionaries[field]
+            matching = [code for code, value in enumerate(values) if predicate(value)]
+            codes = column.indices.to_numpy(zero_copy_only=False)[rows]
+            mask &= np.isin(codes, matching)
+        return rows[mask]
+
+    make_dbentry = staticmethod(make_dbentry)
 
     def lookup(
         self,
@@ -99,7 +342,7 @@ class ScryfallDB:
         unique: bool = False,
         set_code: str = None,
         set_type: str = None,
-    ) -> Iterable[Card]:
+    ) -> Tuple[Card]:
         """Lookup for Cards in the DB with the specified name.
 
         Parameters
@@ -133,9 +376,54 @@ class ScryfallDB:
             specified type.
         Return
         ------
-            (Lazy) Iterable sequence of retrieved Card instances matching the speficied criteria.
+            Tuple of retrieved Card instances matching the speficied criteria.
             Empty result set will be returned if no match is found in the DB.
+
+        Raises
+        ------
+        ValueError
+            If the specified set_type is not allowed.
         """
+        # Short-circuit queries with no card name (e.g. "" or "*") nor set filters
+        is_card = card_name is not None and card_name.strip("*")
+        if not is_card and set_code is None and set_type is None:
+            return tuple()
+        if not is_card:
+            # Results of set-only lookups can be (very) large: not worth memoising
+            return self._lookup(
+                card_name, expand_search, doubles_only, unique, set_code, set_type
+            )
+        key = (
+            card_name.casefold() if card_name is not None else None,
+            expand_search,
+            doubles_only,
+            unique,
+            set_code,
+            set_type,
+        )
+        try:
+            self._lookup_cache.move_to_end(key)
+            return self._lookup_cache[key]
+        except KeyError:
+            pass
+        result = self._lookup(
+            card_name, expand_search, doubles_only, unique, set_code, set_type
+        )
+        self._lookup_cache[key] = result
+        if len(self._lookup_cache) > LOOKUP_CACHE_SIZE:
+            self._lookup_cache.popitem(last=False)  # evict least recently used
+        return result
+
+    def _lookup(
+        self,
+        card_name: Optional[str],
+        expand_search: bool,
+        doubles_only: bool,
+        unique: bool,
+        set_code: Optional[str],
+        set_type: Optional[str],
+    ) -> Tuple[Card]:
+        """Lookup for Cards in the DB (see lookup), with no memoisation"""
         allowed_set_types = (
             "promo",
             "expansion",
@@ -144,104 +432,107 @@ class ScryfallDB:
             "funny",
         )
         if set_type and not set_type in allowed_set_types:
-            return ValueError(
+            raise ValueError(
                 f"Input set type {set_type} Not Recognised. Values allowed are {allowed_set_types}"
             )
 
         is_card = (card_name is not None) and len(card_name.replace("*", ""))
         is_set = set_code is not None
         is_set_type = set_type is not None
-        if not any((is_card, is_set, is_set_type)):
-            return self._result_set([])
 
+        no_rows = np.empty(0, dtype=np.int64)
         if is_card:
             card_dbentry = self.make_dbentry(card_name)
-            entries = self._cards_map.get(card_dbentry, [])
+            rows = self._cards_map.get(card_dbentry, no_rows)
 
-            if not entries and not expand_search:
-                return self._result_set([])  # Empty result
+            if not len(rows) and not expand_search:
+                return tuple()  # Empty result
 
             if expand_search:
-                # set cards pool of reference
-                if doubles_only:
-                    cards_pool = filter(lambda c: "//" in c.name, self.all_cards)
-                else:
-                    cards_pool = self.all_cards
-                # set filter function
-                if card_name.startswith("*") and card_name.endswith("*"):
-                    card_name = card_name[1:-1].lower()
-                    f = lambda c: c.name.lower().startswith(
-                        card_name
-                    ) or c.name.lower().endswith(card_name)
-                elif card_name.startswith("*"):  # SUFFIX
-                    card_name = card_name[1:].lower()
-                    f = lambda c: c.name.lower().endswith(card_name)
-                elif card_name.endswith("*"):  # PREFIX
-                    card_name = card_name[:-1].lower()
-                    f = lambda c: c.name.lower().startswith(card_name)
+                # case-fold the query just once, as names in the indices,
+                # and strip its wildcards to decide the kind of search
+                query = card_name.casefold()
+                is_suffix, is_prefix = query.startswith("*"), query.endswith("*")
+                card_name = query.strip("*")
+                if is_prefix and is_suffix:
+                    expanded_search = np.union1d(
+                        self._startswith_rows(self._prefix_index, card_name),
+                        self._startswith_rows(self._suffix_index, card_name[::-1]),
+                    )
+                elif is_suffix:  # SUFFIX
+                    expanded_search = self._startswith_rows(
+                        self._suffix_index, card_name[::-1]
+                    )
+                elif is_prefix:  # PREFIX
+                    expanded_search = self._startswith_rows(
+                        self._prefix_index, card_name
+                    )
                 else:  # WHOLE-WORD lookup
-                    f = lambda c: self._isin(card_name, c.name)
-                expanded_search = filter(f, cards_pool)
-                entries.extend(expanded_search)
-            entries = tuple(entries)  # make an immutable sequence
+                    hits = None
+                    for word in card_name.split():
+                        word_rows = self._word_index.get(word)
+                        if not word_rows:
+                            hits = None  # short-circuit on the first unknown word
+                            break
+                        hits = word_rows if hits is None else hits & word_rows
+                    if hits is None:
+                        hits = set()
+                    expanded_search = np.fromiter(hits, dtype=np.int64, count=len(hits))
+                # restrict to the double cards pool of reference
+                if doubles_only:
+                    expanded_search = expanded_search[self._doubles[expanded_search]]
+                rows = np.union1d(rows, expanded_search)
+        # With no card name, start from the set code (or set type) index
+        elif is_set:
+            exact_code = set_code in self._expansion_codename_map
+            rows = self._set_code_rows(set_code, exact=exact_code)
+            is_set = False  # already applied
         else:
-            entries = self.all_cards
+            rows = self._set_types_index.get(set_type, no_rows)
+            is_set_type = False  # already applied
 
-        # Lookup by set_code
+        # Lookup by set_code and/or set_type
+        criteria = list()
         if is_set:
             if set_code in self._expansion_codename_map:
-                filter_func = lambda c: c.set_code == set_code
+                criteria.append(("set_code", lambda c: c == set_code))
             else:
-                filter_func = lambda c: c.set_code.startswith(set_code)
-            entries_set = tuple(filter(filter_func, entries))
-            if not entries_set:
-                return self._result_set(())  # Empty result
-            entries = entries_set
-        # Lookup by set_type
+                criteria.append(("set_code", lambda c: c.startswith(set_code)))
         if is_set_type:
-            entries = tuple(filter(lambda c: c.set_type == set_type, entries))
-        # filter unique values
+            criteria.append(("set_type", lambda t: t == set_type))
+        if criteria:
+            rows = self._filter_rows(rows, criteria)
+        # filter unique values: first row of each card name
         if unique:
-            entries_map = dict()
-            for e in entries:
-                _ = entries_map.setdefault(e.name, e)
-            entries = tuple(c for c in entries_map.values())
-        return self._result_set(entries)
-
-    @staticmethod
-    def _result_set(entries: Sequence[Card]) -> Iterable[Card]:
-        if not entries:
-            return iter(tuple())  # empty set
-        else:
-            for e in entries:
-                yield e
-
-    @staticmethod
-    def _isin(card_name: str, db_entry: str) -> bool:
-        db_entry_words = db_entry.lower().split()
-        return reduce(
-            and_, map(lambda n: n in db_entry_words, card_name.lower().split())
-        )
+            _, first = np.unique(self._name_ids[rows], return_index=True)
+            rows = rows[np.sort(first)]
+        return self._take(rows)
 
     def __len__(self) -> int:
-        return sum(map(len, self._cards_map.values()))
+        return self._cards.num_rows
 
-    def __contains__(self, card_name: str) -> bool:
-        return len(tuple(self.lookup(card_name))) > 0
+    def __contains__(self, card_name: Optional[str]) -> bool:
+        # exact (case-insensitive) name lookup: a single probe in the cards map
+        return card_name is not None and self.make_dbentry(card_name) in self._cards_map
 
     def __getitem__(self, card_name: str) -> Tuple[Card]:
         """proxy for lookup with just the card name specified"""
-        return tuple(self.lookup(card_name))
+        return self.lookup(card_name)
 
     def __iter__(self) -> Iterable[Card]:
         return self.all_cards
 
     def _load_codename_map(self) -> Dict[str, str]:
-        codename_seq = set()
-        for entry in self:
-            set_code, set_name = entry.set_code, entry.set_name
-            codename_seq.add((set_code, set_name))
-        return {code: name for code, name in codename_seq}
+        """Map each set code to its set name, straight from the dictionary-encoded
+        columns (first row of each set code), without materialising any Card."""
+        set_codes = self._cards.column("set_code").chunk(0)
+        set_names = self._cards.column("set_name").chunk(0)
+        _, rows = np.unique(
+            set_codes.indices.to_numpy(zero_copy_only=False), return_index=True
+        )
+        codes = set_codes.take(pa.array(rows)).to_pylist()
+        names = set_names.take(pa.array(rows)).to_pylist()
+        return dict(zip(codes, names))
 
     @property
     def expansion_codename_map(self) -> Dict[str, str]:
@@ -252,12 +543,12 @@ class ScryfallDB:
 
     @property
     def all_cards(self) -> Iterable[Card]:
-        for cards in self._cards_map.values():
-            for card in cards:
-                yield card
+        return self._iter_cards(self._cards)
 
     def add_expansion_code(self, codename: Tuple[str, str]) -> None:
         """Method to add any Code-Name expansion set found in the MTG-Manager data
         that is  "missing" from Scryfall"""
         set_code, set_name = codename
         self.expansion_codename_map[set_code] = set_name
+        # lookups by set_code depend on known expansion codes
+        self._lookup_cache.clear()
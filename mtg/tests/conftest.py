@@ -1,20 +1,26 @@
 from pytest import fixture
 from pathlib import Path
 from mtg import Collection, ScryfallDB
+import orjson
 import os
+import shutil
 
 
 BASE_TESTDATA_FOLDER = Path(os.path.abspath(os.path.dirname(__file__))) / "test_data"
 
 
-@fixture(scope="session")
-def old_format_datafile() -> Path:
-    return BASE_TESTDATA_FOLDER / "old_format.csv"
+# Data files are copied in a temporary folder for each test, so that
+# (cache) files written next to them never leak across tests
 
 
-@fixture(scope="session")
-def new_format_datafile() -> Path:
-    return BASE_TESTDATA_FOLDER / "new_format.csv"
+@fixture(scope="function")
+def old_format_datafile(tmp_path) -> Path:
+    return Path(shutil.copy(BASE_TESTDATA_FOLDER / "old_format.csv", tmp_path))
+
+
+@fixture(scope="function")
+def new_format_datafile(tmp_path) -> Path:
+    return Path(shutil.copy(BASE_TESTDATA_FOLDER / "new_format.csv", tmp_path))
 
 
 @fixture(scope="function")  # re-newed every test
@@ -25,3 +31,38 @@ def test_collection(old_format_datafile) -> Collection:
 @fixture(scope="session")
 def scryfall_oracle() -> ScryfallDB:
     return ScryfallDB()
+
+
+def _scryfall_entry(name, set_code, set_name, set_type, lang="en", games=("paper",)):
+    return {
+        "name": name,
+        "lang": lang,
+        "set": set_code,
+        "set_name": set_name,
+        "set_type": set_type,
+        "games": list(games),
+    }
+
+
+# Small (raw) Scryfall DB, for tests not requiring the full Scryfall oracle
+SCRYFALL_TEST_ENTRIES = [
+    _scryfall_entry("Hammer of Bogardan", "mir", "Mirage", "expansion"),
+    _scryfall_entry("Hammer of Bogardan", "wth", "Weatherlight", "expansion"),
+    _scryfall_entry("Hammer of Bogardan", "pmir", "Mirage Promos", "promo"),
+    _scryfall_entry("Fire // Ice", "apc", "Apocalypse", "expansion"),
+    _scryfall_entry("Island", "mir", "Mirage", "expansion"),
+    _scryfall_entry("Island", "mir", "Mirage", "expansion", lang="de"),
+    _scryfall_entry("Island", "prm", "Magic Online Promos", "promo", games=("mtgo",)),
+]
+
+
+@fixture(scope="function")
+def scryfall_entries() -> list:
+    return [dict(entry) for entry in SCRYFALL_TEST_ENTRIES]
+
+
+@fixture(scope="function")
+def scryfall_dbfile(tmp_path, scryfall_entries) -> Path:
+    dbfile = tmp_path / "default_cards.json"
+    dbfile.write_bytes(orjson.dumps(scryfall_entries))
+    return dbfile
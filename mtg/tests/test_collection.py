@@ -1,10 +1,15 @@
+import os
+import shutil
+
 import numpy as np
 from numpy.testing import assert_array_equal
+import pandas as pd
 from pandas.testing import assert_frame_equal, assert_series_equal
 
 from operator import and_
 from functools import reduce
 
+from mtg import collection
 from mtg.collection import Collection
 from pytest import raises
 
@@ -34,6 +39,40 @@ def test_old_format_layout(old_format_datafile):
     assert_array_equal(c.data.ExpansionCode.values, lowercase_codes)
 
 
+def test_old_format_codes_remapping(tmp_path):
+    datafile = tmp_path / "codes.csv"
+    datafile.write_text(
+        "Quantity,Name,Code,PurchasePrice,Foil,Condition,Language,PurchaseDate\n"
+        '1,"Island",MIR,0.0,0,0,5,24/5/2020\n'
+        '1,"Forest",MIR,0.0,0,4,0,24/5/2020\n'
+        '1,"Swamp",MIR,0.0,0,-1,1,24/5/2020\n'
+        '1,"Plains",MIR,0.0,0,7,42,24/5/2020\n'
+    )
+    c = Collection(datafile)
+    # Language categories are sorted, as inferred for the new format
+    assert list(c.data.Language.cat.categories) == ["English", "German", "Spanish"]
+    assert c.data.Language.tolist()[:3] == ["Spanish", "English", "German"]
+    assert c.data.Condition.tolist()[:2] == ["NearMint", "Poor"]
+    # Out of range codes are missing values
+    assert c.data.Condition.isna().tolist() == [False, False, True, True]
+    assert c.data.Language.isna().tolist() == [False, False, False, True]
+
+
+def test_blank_cells_are_missing_values(tmp_path):
+    datafile = tmp_path / "blanks.csv"
+    datafile.write_text(
+        "Quantity,Name,Code,PurchasePrice,Foil,Condition,Language,PurchaseDate\n"
+        '2,"Island",MIR,0.0,0,0,0,24/5/2020\n'
+        ',"Forest",MIR,0.0,0,,,24/5/2020\n'
+        '1,"Swamp",MIR,0.0,0,1,300,24/5/2020\n'
+    )
+    c = Collection(datafile)
+    assert c.data.Quantity.isna().tolist() == [False, True, False]
+    assert c.data.Condition.isna().tolist() == [False, True, False]
+    assert c.data.Language.isna().tolist() == [False, True, True]
+    assert len(c) == 3
+
+
 def test_new_format_layout(new_format_datafile):
     c = Collection(new_format_datafile)
 
@@ -69,6 +108,74 @@ def test_len_collection_is_sum_of_quantities(test_collection):
     assert len(test_collection) == test_collection.data.Quantity.sum()
 
 
+def test_len_collection_follows_data_changes(test_collection):
+    assert len(test_collection) > 0
+    test_collection.data.drop(index=test_collection.data.index[0], inplace=True)
+    assert len(test_collection) == test_collection.data.Quantity.sum()
+    test_collection.data.loc[:, "Quantity"] = 0
+    assert len(test_collection) == 0
+
+
+def test_quantity_arithmetic_and_writes_do_not_overflow(test_collection):
+    quantity = test_collection.Quantity
+    assert (quantity * 100).max() == quantity.max() * 100
+    test_collection[test_collection.Name == "Island", "Quantity"] = 300
+    assert (test_collection[test_collection.Name == "Island"].Quantity == 300).all()
+
+
+def test_write_new_expansion_code(old_format_datafile, new_format_datafile):
+    for datafile in (old_format_datafile, new_format_datafile):
+        c = Collection(datafile)
+        c[c.Name == "Island", "ExpansionCode"] = "pm10"
+        assert (c[c.Name == "Island"].ExpansionCode == "pm10").all()
+
+
+def test_data_loaded_from_feather_cache(new_format_datafile, monkeypatch):
+    data = Collection(new_format_datafile).data
+    assert Collection._cache_filepath(new_format_datafile).exists()
+
+    def fail_read_csv(*args, **kwargs):
+        raise AssertionError("CSV file parsed, despite the cache")
+
+    monkeypatch.setattr(pd, "read_csv", fail_read_csv)
+    assert_frame_equal(Collection(new_format_datafile).data, data)
+
+
+def test_cache_write_failure_is_ignored(old_format_datafile, monkeypatch):
+    def fail_to_feather(*args, **kwargs):
+        raise OSError("Read-only file system")
+
+    monkeypatch.setattr(collection.feather, "write_feather", fail_to_feather)
+    c = Collection(old_format_datafile)
+    assert len(c.data) > 0
+    assert not Collection._cache_filepath(old_format_datafile).exists()
+
+
+def test_save_rewrites_feather_cache(new_format_datafile, tmp_path):
+    c = Collection(new_format_datafile)
+    c[c.Name == "Island", "Quantity"] = 5
+    c.save(target_folder=tmp_path / "saved", verbose=False)
+
+    saved_filepath = tmp_path / "saved" / new_format_datafile.name
+    cache_filepath = Collection._cache_filepath(saved_filepath)
+    assert cache_filepath.exists()
+    assert_frame_equal(pd.read_feather(cache_filepath), c.data)
+    assert_frame_equal(Collection(saved_filepath).data, c.data)
+
+
+def test_cache_ignored_for_replaced_csv_file(old_format_datafile, tmp_path):
+    c = Collection(old_format_datafile)
+    assert (c[c.Name == "Island"].Quantity > 0).all()
+    c[c.Name == "Island", "Quantity"] = 0
+    c.save(target_folder=tmp_path / "saved", verbose=False)
+    # CSV file replaced by a file older than the cache (e.g. cp -p)
+    stat = old_format_datafile.stat()
+    shutil.copy(tmp_path / "saved" / old_format_datafile.name, old_format_datafile)
+    os.utime(old_format_datafile, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**9))
+    c = Collection(old_format_datafile)
+    assert (c[c.Name == "Island"].Quantity == 0).all()
+
+
 def test_collection_is_hashable(test_collection):
     assert hash(test_collection) is not None
     assert hash(test_collection) == hash(test_collection.source + test_collection.label)
@@ -141,6 +248,14 @@ def test_add_new_column_to_collection(test_collection):
     assert reduce(and_, map(lambda p: p[0] > p[1] and p[0] == p[1] + 1, zip(nqs, qs)))
 
 
+def test_proxied_attributes_follow_data_changes(test_collection):
+    _ = test_collection.columns, test_collection.Name
+    test_collection.data["Extra"] = 1
+    assert "Extra" in test_collection.columns
+    test_collection.data.loc[0, "Name"] = "CHANGED"
+    assert test_collection.Name[0] == "CHANGED"
+
+
 def test_diff_collections_nodiffs(new_format_datafile):
     c1 = Collection(new_format_datafile, label="Islands", source="Other NEW")
     c2 = Collection(new_format_datafile, label="Islands", source="NEW")
@@ -1,4 +1,10 @@
+import orjson
+import os
+import pickle
+import time
+
 from mtg import ScryfallDB
+from mtg import scryfall
 from pytest import raises
 
 
@@ -35,9 +41,7 @@ def test_set_type_restriction(scryfall_oracle: ScryfallDB):
     hammer_res = scryfall_oracle.lookup("HAMMEr of BOGardAn", set_type="memorabilia")
     hammer_res = tuple(hammer_res)
     assert len(hammer_res) == 3
-    assert len(list(filter(lambda c: c.set_type == "memorabilia", hammer_res))) == len(
-        hammer_res
-    )
+    assert all(c.set_type == "memorabilia" for c in hammer_res)
 
 
 def test_lookup_from_a_single_set_code(scryfall_oracle: ScryfallDB):
@@ -64,35 +68,23 @@ def test_expanded_search_prefix(scryfall_oracle: ScryfallDB):
     res = scryfall_oracle.lookup("spring*", expand_search=True)
     res = tuple(res)
     assert len(res) == 21
-    assert len(list(filter(lambda c: c.name.lower().startswith("spring"), res))) == len(
-        res
-    )
+    assert all(c.name.lower().startswith("spring") for c in res)
 
 
 def test_expanded_search_suffix(scryfall_oracle: ScryfallDB):
     res = scryfall_oracle.lookup("*spring", expand_search=True)
     res = tuple(res)
     assert len(res) == 43
-    assert len(list(filter(lambda c: c.name.lower().endswith("spring"), res))) == len(
-        res
-    )
+    assert all(c.name.lower().endswith("spring") for c in res)
 
 
 def test_expanded_search_prefix_suffix(scryfall_oracle: ScryfallDB):
     res = scryfall_oracle.lookup("*spring*", expand_search=True)
     res = tuple(res)
     assert len(res) == 64, f"Not 64 items, {len(res)}"
-    assert (
-        len(
-            list(
-                filter(
-                    lambda c: c.name.lower().endswith("spring")
-                    or c.name.lower().startswith("spring"),
-                    res,
-                )
-            )
-        )
-        == len(res)
+    assert all(
+        c.name.lower().endswith("spring") or c.name.lower().startswith("spring")
+        for c in res
     )
 
 
@@ -100,7 +92,7 @@ def test_expanded_search_case_insensitive(scryfall_oracle: ScryfallDB):
     res = scryfall_oracle.lookup("spring", expand_search=True)
     res = tuple(res)
     assert len(res) > 0
-    assert len(list(filter(lambda c: "spring" in c.name.lower(), res))) == len(res)
+    assert all("spring" in c.name.lower() for c in res)
 
 
 def test_search_for_doubles(scryfall_oracle: ScryfallDB):
@@ -109,7 +101,7 @@ def test_search_for_doubles(scryfall_oracle: ScryfallDB):
     )
     res = tuple(res)
     assert len(res) == 4
-    assert len(list(filter(lambda c: "ice" in c.name.lower(), res))) == len(res)
+    assert all("ice" in c.name.lower() for c in res)
 
     res = scryfall_oracle.lookup(
         "Akki Lavarunner", expand_search=True, doubles_only=True, unique=True
@@ -125,9 +117,7 @@ def test_search_for_doubles_with_prefix(scryfall_oracle: ScryfallDB):
     )
     res = tuple(res)
     assert len(res) == 2
-    assert len(list(filter(lambda c: c.name.lower().startswith("ice"), res))) == len(
-        res
-    )
+    assert all(c.name.lower().startswith("ice") for c in res)
 
 
 def test_search_for_doubles_with_suffix(scryfall_oracle: ScryfallDB):
@@ -136,7 +126,7 @@ def test_search_for_doubles_with_suffix(scryfall_oracle: ScryfallDB):
     )
     res = tuple(res)
     assert len(res) == 4
-    assert len(list(filter(lambda c: c.name.lower().endswith("ice"), res))) == len(res)
+    assert all(c.name.lower().endswith("ice") for c in res)
 
 
 def test_getitem_from_oracle(scryfall_oracle: ScryfallDB):
@@ -149,3 +139,145 @@ def test_getitem_from_oracle(scryfall_oracle: ScryfallDB):
 def test_contains_lookup_in_oracle(scryfall_oracle: ScryfallDB):
     assert "Fireball" in scryfall_oracle
     assert "non-existing-card" not in scryfall_oracle
+
+
+def test_contains_lookup(scryfall_entries):
+    db = ScryfallDB(db_preloaded=scryfall_entries)
+    assert "fire // ice" in db
+    assert "Hammer of Bogardan" in db
+    assert "non-existing-card" not in db
+    assert None not in db
+
+
+def test_cards_cache_write_failure_is_ignored(scryfall_dbfile, monkeypatch):
+    def fail_write_feather(*args, **kwargs):
+        raise OSError("Read-only file system")
+
+    monkeypatch.setattr(scryfall.feather, "write_feather", fail_write_feather)
+    db = ScryfallDB(dbfile=scryfall_dbfile)
+    assert not scryfall_dbfile.with_suffix(".feather").exists()
+    assert len(db.lookup("hammer of bogardan")) == 3
+
+
+def test_unreadable_cards_cache_is_ignored(scryfall_dbfile):
+    ScryfallDB(dbfile=scryfall_dbfile)
+    cache_file = scryfall_dbfile.with_suffix(".feather")
+    cache_file.write_bytes(cache_file.read_bytes()[:100])  # truncated cache
+    db = ScryfallDB(dbfile=scryfall_dbfile)
+    assert len(db.lookup("hammer of bogardan")) == 3
+    # the cache file is written again from the JSON DB
+    assert scryfall.feather.read_table(cache_file).num_rows == len(db)
+    assert not cache_file.with_suffix(".feather.tmp").exists()
+
+
+def test_name_indices_saved_and_loaded(scryfall_dbfile, monkeypatch):
+    db = ScryfallDB(dbfile=scryfall_dbfile)
+    index_file = scryfall_dbfile.with_suffix(".index.pkl")
+    assert index_file.exists()
+    hammer_res = db.lookup("hammer of bogardan")
+    fire_res = db.lookup("fire", expand_search=True, doubles_only=True)
+    assert len(hammer_res) == 3 and len(fire_res) == 1
+
+    def fail_build_name_indices(self):
+        raise AssertionError("Indices built, despite the index file")
+
+    monkeypatch.setattr(ScryfallDB, "_build_name_indices", fail_build_name_indices)
+    db = ScryfallDB(dbfile=scryfall_dbfile)
+    assert db.lookup("hammer of bogardan") == hammer_res
+    assert db.lookup("fire", expand_search=True, doubles_only=True) == fire_res
+
+
+def test_name_indices_rebuilt_on_format_mismatch(scryfall_dbfile):
+    ScryfallDB(dbfile=scryfall_dbfile)
+    index_file = scryfall_dbfile.with_suffix(".index.pkl")
+    with open(index_file, "wb") as indices_file:
+        pickle.dump((ScryfallDB.INDEX_FORMAT_VERSION - 1, ({}, {})), indices_file)
+    db = ScryfallDB(dbfile=scryfall_dbfile)
+    assert len(db.lookup("hammer of bogardan")) == 3
+    with open(index_file, "rb") as indices_file:
+        version, _, _ = pickle.load(indices_file)
+    assert version == ScryfallDB.INDEX_FORMAT_VERSION
+
+
+def test_name_indices_rebuilt_for_other_cards(
+    scryfall_dbfile, scryfall_entries, monkeypatch
+):
+    ScryfallDB(dbfile=scryfall_dbfile)
+    # JSON DB updated, with the (stale) Feather cache failing to be rewritten
+    scryfall_entries[4]["name"] = "Mountain"
+    scryfall_dbfile.write_bytes(orjson.dumps(scryfall_entries))
+    os.utime(scryfall_dbfile, ns=(time.time_ns() + 10**9,) * 2)
+
+    def fail_write_feather(*args, **kwargs):
+        raise OSError("Read-only file system")
+
+    monkeypatch.setattr(scryfall.feather, "write_feather", fail_write_feather)
+    db = ScryfallDB(dbfile=scryfall_dbfile)
+    assert db.lookup("Island") == ()
+    assert [card.name for card in db.lookup("Mountain")] == ["Mountain"]
+
+
+def test_name_indices_save_failure_is_ignored(scryfall_dbfile, monkeypatch):
+    def fail_dump(*args, **kwargs):
+        raise OSError("Read-only file system")
+
+    monkeypatch.setattr(scryfall.pickle, "dump", fail_dump)
+    db = ScryfallDB(dbfile=scryfall_dbfile)
+    assert len(db.lookup("hammer of bogardan")) == 3
+
+
+def test_no_english_cards_in_db(scryfall_entries):
+    german_cards = [entry for entry in scryfall_entries if entry["lang"] == "de"]
+    db = ScryfallDB(db_preloaded=german_cards)
+    assert len(db) == 0
+    assert db.lookup("Island") == ()
+    assert db.lookup("isl", expand_search=True) == ()
+    assert db.lookup(set_code="mir") == ()
+    assert db.expansion_codename_map == {}
+
+
+def test_unknown_set_type_raises_value_error(scryfall_entries):
+    db = ScryfallDB(db_preloaded=scryfall_entries)
+    with raises(ValueError):
+        db.lookup("Island", set_type="unknown")
+    with raises(ValueError):
+        db.lookup(set_type="unknown")
+    assert len(db._lookup_cache) == 0
+
+
+def test_lookup_results_are_memoised(scryfall_entries, monkeypatch):
+    db = ScryfallDB(db_preloaded=scryfall_entries)
+    hammer_res = db.lookup("Hammer of Bogardan", set_code="mir")
+    assert len(hammer_res) == 1
+
+    def fail_lookup(*args, **kwargs):
+        raise AssertionError("Lookup not memoised")
+
+    monkeypatch.setattr(db, "_lookup", fail_lookup)
+    assert db.lookup("HAMMER of bogardan", set_code="mir") is hammer_res
+
+
+def test_set_only_lookups_are_not_memoised(scryfall_entries):
+    db = ScryfallDB(db_preloaded=scryfall_entries)
+    mirage_cards = db.lookup(set_code="mir")
+    assert len(mirage_cards) == 2
+    assert len(db.lookup(set_type="promo")) == 1
+    assert len(db._lookup_cache) == 0
+
+
+def test_add_expansion_code_invalidates_lookup_cache(scryfall_entries):
+    db = ScryfallDB(db_preloaded=scryfall_entries)
+    # "pmi" is not a known expansion code: searched as a prefix
+    assert len(db.lookup("Hammer of Bogardan", set_code="pmi")) == 1
+    db.add_expansion_code(("pmi", "Mirage Promos (Missing)"))
+    assert len(db._lookup_cache) == 0
+    # known expansion codes are matched exactly
+    assert db.lookup("Hammer of Bogardan", set_code="pmi") == ()
+
+
+def test_whole_word_lookup(scryfall_entries):
+    db = ScryfallDB(db_preloaded=scryfall_entries)
+    assert len(db.lookup("hammer", expand_search=True)) == 3
+    assert len(db.lookup("Hammer BOGARDAN", expand_search=True, unique=True)) == 1
+    assert db.lookup("hammer unknown", expand_search=True) == ()
+    assert db.lookup("unknown hammer", expand_search=True) == ()